@@ -15,11 +15,15 @@ Example usage:
   END
   ```
 '''
+import os
+import re
 import sys
-import json
 import yaml
 import click
+import select
 import signal
+import secrets
+import hashlib
 import asyncio
 import pathlib
 import logging
@@ -28,18 +32,30 @@ import datetime
 import functools
 import contextlib
 import inspect
+import aiohttp
+import urllib.parse
 from aiohttp import web
 from collections import OrderedDict
-from datetime import datetime
+from datetime import datetime, timezone
 from dataclasses import dataclass
-from dateutil.parser import parse as fromTs
+from email.utils import format_datetime
+
+try:
+  import uvloop
+except ImportError:
+  uvloop = None
 
 logger = logging.getLogger(__name__)
 
-chunk_size = 8192
+chunk_size = 1 << 17
+read_bufsize = 1 << 20
+# prewarm a parent with one listing rather than a stat per file only when
+#  it has at least this many mapped files, giving up on it after a timeout
+prewarm_list_min_files = 8
+prewarm_list_timeout = 10
 
 def _escape_quotes(s):
-  return s.replace(r"'", r"''")
+  return s.replace("'", "''") if "'" in s else s
 
 async def _await(maybe_awaitable):
   if inspect.isawaitable(maybe_awaitable):
@@ -58,47 +74,204 @@ async def _try_wait_for(cond, args=tuple(), max_tries=3, backoff=1):
       return False
     await asyncio.sleep(backoff)
 
-def _async_lru_cache(cache_size=None):
-  def decorator(func):
-    _cache = {} if cache_size is None else OrderedDict()
-    @functools.wraps(func)
-    async def wrapper(*args, **kwargs):
-      k = json.dumps(dict(args=args, kwargs=kwargs))
-      if k in _cache:
-        logger.debug(f"cache hit {func} {k}")
-        return _cache[k]
-      else:
-        logger.debug(f"cache miss {func} {k}")
-        _cache[k] = await func(*args, **kwargs)
-        if cache_size is not None:
-          while len(_cache) > cache_size:
-            _cache.popitem(False)
-      return _cache[k]
-    return wrapper
-  return decorator
+class _AsyncLRU:
+  ''' Cache results of an async function by its arguments, concurrent
+  calls with the same arguments share a single pending call.
+
+  Usage:
+  @_AsyncLRU.decorator(size=None)
+  async def f(x): ...
+  '''
+  __slots__ = ('cache', 'size', 'func')
+
+  def __init__(self, func, size=None):
+    self.cache = {} if size is None else OrderedDict()
+    self.size = size
+    self.func = func
+
+  @classmethod
+  def decorator(cls, size=None):
+    return functools.partial(cls, size=size)
+
+  def _insert(self, k, value):
+    self.cache[k] = value
+    # one insertion per call, so at most one eviction is needed
+    if self.size is not None and len(self.cache) > self.size:
+      self.cache.popitem(last=False)
+
+  def _settle(self, k, task):
+    if self.cache.get(k) is not task: return
+    if task.cancelled() or task.exception() is not None:
+      # don't cache failures, the next call should retry
+      del self.cache[k]
+    else:
+      self.cache[k] = task.result()
+
+  async def __call__(self, *args, **kwargs):
+    k = (args, tuple(sorted(kwargs.items())))
+    if k in self.cache:
+      logger.debug(f"cache hit {self.func} {k}")
+      if self.size is not None: self.cache.move_to_end(k)
+      value = self.cache[k]
+    else:
+      logger.debug(f"cache miss {self.func} {k}")
+      # concurrent callers for the same key share this task
+      value = asyncio.ensure_future(self.func(*args, **kwargs))
+      value.add_done_callback(functools.partial(self._settle, k))
+      self._insert(k, value)
+    if isinstance(value, asyncio.Future):
+      return await asyncio.shield(value)
+    return value
+
+  def cache_prime(self, value, *args, **kwargs):
+    ''' Store value as the result of calling with args, kwargs
+    '''
+    k = (args, tuple(sorted(kwargs.items())))
+    if k not in self.cache: self._insert(k, value)
+
+_rfc3339_fraction = re.compile(r'(\.\d{1,6})\d*')
+
+def _parse_rfc3339(s):
+  ''' Parse rclone's RFC3339 timestamps, which may carry nanoseconds
+  '''
+  s = _rfc3339_fraction.sub(lambda m: m.group(1).ljust(7, '0'), s.replace('Z', '+00:00'))
+  return datetime.fromisoformat(s)
 
 def _datetime_to_rfc2822(dt):
-  return dt.strftime("%a, %d %b %Y %H:%M:%S GMT")
+  return format_datetime(dt.astimezone(timezone.utc), usegmt=True)
 
-@_async_lru_cache()
-async def _rclone_file_headers(rclone_path):
-  proc = await asyncio.create_subprocess_exec(
-    'rclone', 'lsjson', rclone_path,
-    stdout=asyncio.subprocess.PIPE,
-    stderr=sys.stderr,
-  )
-  stdout, _stderr = await proc.communicate()
-  if proc.returncode != 0: return None
-  file_metadata, = json.loads(stdout)
+def _rclone_remote_prefix_length(rclone_path):
+  ''' Length of the `remote:` / `:backend,params:` prefix of an rclone path,
+  0 if it has none. Quoted parameter values may contain ':' and '/'.
+  '''
+  quote = None
+  for i, c in enumerate(rclone_path):
+    if quote is not None:
+      # a doubled quote escapes itself, leaving and re-entering has the same effect
+      if c == quote: quote = None
+    elif c in '\'"':
+      quote = c
+    elif c == '/':
+      return 0
+    elif c == ':' and i > 0:
+      return i + 1
+  return 0
+
+def _rclone_split(rclone_path):
+  ''' Split an rclone path into the (fs, remote) pair used by the rc api
+
+  >>> _rclone_split(':s3,env_auth=True:bucket/prefix/file')
+  (':s3,env_auth=True:bucket/prefix', 'file')
+  >>> _rclone_split('remote:file')
+  ('remote:', 'file')
+  >>> _rclone_split('remote:/file')
+  ('remote:/', 'file')
+  >>> _rclone_split('remote:/dir/file')
+  ('remote:/dir', 'file')
+  >>> _rclone_split(":http,url='https://ex.com/dir':file.txt")
+  (":http,url='https://ex.com/dir':", 'file.txt')
+  >>> _rclone_split(":http,url='https://ex.com/a:b''c':dir/file.txt")
+  (":http,url='https://ex.com/a:b''c':dir", 'file.txt')
+  '''
+  i = _rclone_remote_prefix_length(rclone_path)
+  prefix, path = rclone_path[:i], rclone_path[i:]
+  parent, sep, remote = path.rpartition('/')
+  if sep and not parent:
+    # keep the root, `remote:/file` is not relative to the remote's home
+    parent = '/'
+  elif not sep and not prefix:
+    parent = '.'
+  return prefix + parent, remote
+
+def _rclone_local_path(rclone_path):
+  ''' The local filesystem path an rclone path refers to, if any
+  '''
+  if rclone_path.startswith(':local:'):
+    return pathlib.Path(rclone_path[len(':local:'):])
+  elif rclone_path.startswith('/'):
+    return pathlib.Path(rclone_path)
+
+def _rclone_headers(file_metadata):
+  # Date is left to aiohttp which keeps it current for each response
   return {
     'Content-Length': str(file_metadata['Size']),
     'Content-Type': file_metadata['MimeType'],
-    'Date': _datetime_to_rfc2822(datetime.now()),
-    'Last-Modified': _datetime_to_rfc2822(fromTs(file_metadata['ModTime'])),
+    'Last-Modified': _datetime_to_rfc2822(_parse_rfc3339(file_metadata['ModTime'])),
+  }
+
+async def _rclone_file_headers(rcd, rclone_path):
+  fs, remote = _rclone_split(rclone_path)
+  async with rcd.client.post(
+    f"{rcd.url}operations/stat",
+    json=dict(fs=fs, remote=remote),
+  ) as resp:
+    if resp.status != 200: return None
+    file_metadata = (await resp.json())['item']
+  if file_metadata is None or file_metadata['IsDir']: return None
+  return _rclone_headers(file_metadata)
+
+def _glob_escape(name):
+  return re.sub(r'([\\*?\[\]{}])', r'\\\1', name)
+
+async def _rclone_list_headers(rcd, fs, remotes):
+  ''' Headers for the files named remotes directly under fs, keyed by remote
+  '''
+  async with rcd.client.post(
+    f"{rcd.url}operations/list",
+    json=dict(
+      fs=fs,
+      remote='',
+      opt=dict(filesOnly=True),
+      # have rclone drop everything else rather than sending us the whole directory
+      _filter=dict(IncludeRule=[f"/{_glob_escape(remote)}" for remote in remotes]),
+    ),
+  ) as resp:
+    if resp.status != 200: return {}
+    items = (await resp.json())['list']
+  return {
+    item['Path']: _rclone_headers(item)
+    for item in items
+    if item['Path'] in remotes
   }
 
+async def _prewarm_file_headers(rcd, file_headers, rclone_paths):
+  ''' Populate the file_headers cache for all rclone_paths, listing a parent
+  once rather than issuing a stat per file when it has enough mapped files
+  '''
+  groups = {}
+  for rclone_path in rclone_paths:
+    if _rclone_local_path(rclone_path) is not None: continue
+    fs, remote = _rclone_split(rclone_path)
+    groups.setdefault(fs, {})[remote] = rclone_path
+  #
+  async def prewarm(fs, group):
+    if len(group) >= prewarm_list_min_files:
+      try:
+        listed = await asyncio.wait_for(_rclone_list_headers(rcd, fs, group), prewarm_list_timeout)
+      except asyncio.TimeoutError:
+        logger.warning(f"prewarm listing {fs} timed out, falling back to stat")
+      else:
+        for remote, headers in listed.items():
+          file_headers.cache_prime(headers, group[remote])
+        return
+    await asyncio.gather(*map(file_headers, group.values()))
+  #
+  results = await asyncio.gather(
+    *(prewarm(fs, group) for fs, group in groups.items()),
+    return_exceptions=True,
+  )
+  for result in results:
+    if isinstance(result, Exception):
+      logger.warning(f"prewarm failed: {result}")
+
 async def _serve_rclone_file(request, rclone_path):
-  headers = await _rclone_file_headers(rclone_path)
+  local_path = _rclone_local_path(rclone_path)
+  if local_path is not None:
+    if not local_path.is_file(): raise web.HTTPNotFound
+    return web.FileResponse(local_path, chunk_size=chunk_size)
+  #
+  rcd = request.app['rcd']
+  headers = await request.app['file_headers'](rclone_path)
   if headers is None: raise web.HTTPNotFound
   if request.method == 'HEAD':
     return web.Response(
@@ -107,26 +280,92 @@ async def _serve_rclone_file(request, rclone_path):
       headers=headers,
     )
   #
-  try:
-    proc = await asyncio.create_subprocess_exec(
-      'rclone', 'cat', rclone_path,
-      stdout=asyncio.subprocess.PIPE,
-      stderr=sys.stderr,
+  fs, remote = _rclone_split(rclone_path)
+  async with rcd.client.get(
+    rcd.url + urllib.parse.quote(f"[{fs}]/{remote}"),
+  ) as resp:
+    if resp.status != 200:
+      logger.error(f"rcd responded {resp.status} for {rclone_path}")
+      raise web.HTTPBadGateway
+    response = web.StreamResponse(
+      status=200,
+      reason='OK',
+      headers=headers,
     )
-  except Exception as e:
-    logger.error(e)
-  response = web.StreamResponse(
-    status=200,
-    reason='OK',
-    headers=headers,
-  )
-  await response.prepare(request)
-  while not proc.stdout.at_eof():
-    chunk = await proc.stdout.read(chunk_size)
-    await response.write(chunk)
+    # frame by length rather than chunked encoding, trusting the body
+    #  we're about to stream over possibly stale cached metadata
+    response.content_length = resp.content_length if resp.content_length is not None else int(headers['Content-Length'])
+    await response.prepare(request)
+    async for chunk in resp.content.iter_any():
+      await response.write(chunk)
   await response.write_eof()
   return response
 
+async def _forward_lines(reader, writer):
+  async for line in reader:
+    writer.write(line.decode(errors='replace'))
+    writer.flush()
+
+@dataclass
+class RunningRCloneRcd:
+  proc: asyncio.subprocess.Process
+  url: str
+  client: aiohttp.ClientSession
+
+@contextlib.asynccontextmanager
+async def RCloneRcd(*flags):
+  ''' Usage:
+  async with RCloneRcd() as rcd:
+    pass # talk to the rc api at rcd.url using rcd.client
+  '''
+  args = ('rclone', 'rcd', '--rc-serve', '--rc-addr=127.0.0.1:0', *flags)
+  logger.debug(' '.join(args))
+  # random credentials so other local users can't drive the rc api,
+  #  passed through the environment to keep them out of the process list
+  auth = aiohttp.BasicAuth(secrets.token_urlsafe(), secrets.token_urlsafe())
+  # start rclone rcd
+  proc = await asyncio.create_subprocess_exec(
+    *args,
+    stderr=asyncio.subprocess.PIPE,
+    env=dict(os.environ, RCLONE_RC_USER=auth.login, RCLONE_RC_PASS=auth.password),
+  )
+  # wait for rcd to report the address it's listening on
+  url = None
+  while url is None:
+    line = await proc.stderr.readline()
+    if not line: break
+    sys.stderr.write(line.decode(errors='replace'))
+    m = re.search(r'Serving remote control on (\S+)', line.decode(errors='replace'))
+    if m: url = m.group(1).rstrip('/') + '/'
+  # ensure the process is still running
+  assert url is not None and proc.returncode is None
+  forward = asyncio.create_task(_forward_lines(proc.stderr, sys.stderr))
+  #
+  try:
+    async with aiohttp.ClientSession(
+      connector=aiohttp.TCPConnector(limit=0, limit_per_host=32, keepalive_timeout=75),
+      auth=auth,
+      read_bufsize=read_bufsize,
+    ) as client:
+      yield RunningRCloneRcd(
+        proc=proc,
+        url=url,
+        client=client,
+      )
+  finally:
+    proc.send_signal(signal.SIGINT)
+    await proc.wait()
+    await forward
+
+def _add_plain_route(app, path, handler):
+  ''' Route GET/HEAD for path taken literally, rather than as a
+  route template where `{...}` would match anything
+  '''
+  resource = web.PlainResource(path)
+  app.router.register_resource(resource)
+  resource.add_route('GET', handler)
+  resource.add_route('HEAD', handler)
+
 def _create_app(mappings):
   '''
   [path_on_webserver]: [rclone_uri]
@@ -137,41 +376,92 @@ def _create_app(mappings):
   /b/c: :s3,env_auth=True:bucket/prefix/file2
   ```
   '''
-  listing = {}
   for mapping in mappings:
-    src_split = mapping.split('/')
-    for i in range(1, len(src_split)):
-      path_parent = '/'.join(src_split[:i-1]) + '/'
-      path_current = '/'.join(src_split[:i]) + '/'
-      if path_parent not in listing: listing[path_parent] = {}
-      listing[path_parent][path_current] = True
-    path_parent = '/'.join(src_split[:-1]) + '/'
-    if path_parent not in listing: listing[path_parent] = {}
-    listing[path_parent][src_split[-1]] = True
+    if not mapping.startswith('/'):
+      raise ValueError(f"{mapping!r} should be an absolute path starting with '/'")
+  #
+  # directories are dicts, files are the mapping key which put them there
+  tree = {}
+  def any_file(node):
+    while isinstance(node, dict): node = next(iter(node.values()))
+    return node
+  for mapping in mappings:
+    node = tree
+    *dirs, name = mapping.strip('/').split('/')
+    for seg in dirs:
+      node = node.setdefault(seg, {})
+      if not isinstance(node, dict):
+        raise ValueError(f"{mapping!r} needs {node!r} to be a directory, but it is mapped as a file")
+    if isinstance(node.get(name), dict):
+      raise ValueError(f"{mapping!r} is mapped as a file, but {any_file(node[name])!r} needs it to be a directory")
+    node[name] = mapping
+  #
+  listing = {}
+  def walk(node, path):
+    listing[path] = {
+      f"{path}{seg}/" if isinstance(child, dict) else seg: True
+      for seg, child in node.items()
+    }
+    for seg, child in node.items():
+      if isinstance(child, dict): walk(child, f"{path}{seg}/")
+  walk(tree, '/')
   #
   logger.debug(f"{mappings=}")
   logger.debug(f"{listing=}")
   #
-  async def handler(request):
-    path = f"/{request.match_info['path']}"
-    if path in mappings:
+  listing_html = {
+    path: (
+      '<html><body>'
+      + ''.join(
+        f"<a href='{p}'>{p}</a><br>"
+        for p in sorted(entries)
+      )
+      + '</body></html>'
+    ).encode('utf-8')
+    for path, entries in listing.items()
+  }
+  #
+  def serve_handler(path, rclone_path):
+    async def handler(request):
       logger.info(f"serve {path}")
-      return await _serve_rclone_file(request, mappings[path])
-    elif path in listing:
+      return await _serve_rclone_file(request, rclone_path)
+    return handler
+  #
+  def list_handler(path, body):
+    etag = hashlib.sha256(body).hexdigest()
+    headers = {'ETag': f'"{etag}"', 'Cache-Control': 'max-age=60'}
+    async def handler(request):
       logger.info(f"list {path}")
+      # If-None-Match uses weak comparison, so W/ tags match too
+      if any(tag.value in (etag, '*') for tag in request.if_none_match or ()):
+        return web.Response(status=304, headers=headers)
       return web.Response(
-        body=''.join(
-          f"<a href='{p}'>{p}</a>"
-          for p in listing[path]
-        ),
+        body=body,
         content_type='text/html',
+        charset='utf-8',
+        headers=headers,
       )
-    else:
-      logger.info(f"unhandled {path}")
-      raise web.HTTPNotFound
+    return handler
+  #
+  async def rcd_ctx(app):
+    async with RCloneRcd() as rcd:
+      app['rcd'] = rcd
+      app['file_headers'] = _AsyncLRU(functools.partial(_rclone_file_headers, rcd))
+      # prewarm in the background, lookups fall back to lazy until it's done
+      prewarm = asyncio.create_task(_prewarm_file_headers(rcd, app['file_headers'], mappings.values()))
+      try:
+        yield
+      finally:
+        prewarm.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+          await prewarm
   #
   app = web.Application()
-  app.add_routes([web.get('/{path:.*}', handler)])
+  app.cleanup_ctx.append(rcd_ctx)
+  for path, body in listing_html.items():
+    _add_plain_route(app, path, list_handler(path, body))
+  for path, rclone_path in mappings.items():
+    _add_plain_route(app, path, serve_handler(path, rclone_path))
   return app
 
 @contextlib.asynccontextmanager
@@ -203,6 +493,35 @@ async def MountTemporaryDirectory(mountdir=None):
     if await _try_wait_for(_mountdir.is_mount) and mountdir is None:
       _mountdir.rmdir()
 
+async def _wait_for_mount(proc, mountdir, backoff=1):
+  ''' Wait until mountdir is a mount point or proc exits, waking on
+  changes to /proc/self/mountinfo where available, otherwise polling
+  '''
+  loop = asyncio.get_running_loop()
+  changed = asyncio.Event()
+  with contextlib.ExitStack() as stack:
+    exited = asyncio.ensure_future(proc.wait())
+    exited.add_done_callback(lambda _: changed.set())
+    stack.callback(exited.cancel)
+    try:
+      # the kernel flags mountinfo with POLLPRI whenever the mount table changes
+      fd = os.open('/proc/self/mountinfo', os.O_RDONLY)
+      stack.callback(os.close, fd)
+      ep = select.epoll()
+      stack.callback(ep.close)
+      ep.register(fd, select.EPOLLPRI | select.EPOLLERR)
+      def on_change():
+        ep.poll(0)
+        changed.set()
+      loop.add_reader(ep.fileno(), on_change)
+      stack.callback(loop.remove_reader, ep.fileno())
+    except (AttributeError, OSError, NotImplementedError):
+      logger.debug('mount table notifications unavailable, polling')
+    while proc.returncode is None and not mountdir.is_mount():
+      changed.clear()
+      with contextlib.suppress(asyncio.TimeoutError):
+        await asyncio.wait_for(changed.wait(), backoff)
+
 @contextlib.asynccontextmanager
 async def RCloneMount(remote, mountdir, *flags):
   ''' Usage:
@@ -215,8 +534,7 @@ async def RCloneMount(remote, mountdir, *flags):
   # start rclone mount
   proc = await asyncio.create_subprocess_exec(*args)
   # wait for directory to be mounted
-  while proc.returncode is None and not mountdir.is_mount():
-    await asyncio.sleep(1)
+  await _wait_for_mount(proc, mountdir)
   # ensure the process is still running
   assert proc.returncode is None
   #
@@ -237,11 +555,11 @@ async def RClonePathmap(mappings, upperdir, mountdir, *rclone_flags):
   async with RClonePathmap({ "/a": ":s3,env_auth=True:bucket/input" }, ':s3,env_auth=True:bucket/workdir', None) as (tmpdir, *_):
     pass # do things in tmpdir
   '''
+  union = f":union,upstreams='{_escape_quotes(upperdir)} :http::ro':"
   async with _serve(mappings) as runner:
-  # async with _serve(mappings) as runner:
     ((host, port), *_) = filter(lambda t: len(t)==2, runner.addresses)
     async with RCloneMount(
-      f":union,upstreams='{_escape_quotes(upperdir)} :http::ro':",
+      union,
       mountdir,
       f"--http-url=http://{host}:{port}",
       *rclone_flags,
@@ -251,11 +569,31 @@ async def RClonePathmap(mappings, upperdir, mountdir, *rclone_flags):
         runner=runner,
       )
 
+class _StringLoader(getattr(yaml, 'CSafeLoader', yaml.SafeLoader)):
+  ''' libyaml-backed where available, but without implicit resolvers so
+  untagged scalars stay strings as they would with yaml.BaseLoader
+  '''
+  yaml_implicit_resolvers = {}
+
+def _load_config(config):
+  ''' Load a yaml mapping of path_on_webserver to rclone_uri, as strings
+  '''
+  mappings = yaml.load(config, Loader=_StringLoader) or {}
+  if not isinstance(mappings, dict):
+    raise ValueError('config should be a mapping of path_on_webserver to rclone_uri')
+  for k, v in mappings.items():
+    # explicit tags like `!!int 5` are still constructed
+    if not isinstance(k, str) or not isinstance(v, str):
+      raise ValueError(f"{k!r}: {v!r} should map a string path to a string rclone_uri")
+  return mappings
+
 @click.group(help=__doc__)
 @click.version_option()
 @click.option('-v', '--verbose', count=True, default=0, help='How verbose this should be, more -v = more verbose')
 def cli(verbose=0):
   logging.basicConfig(level=30 - (verbose*10))
+  if uvloop is not None:
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
 
 @cli.command()
 @click.option('-c', '--config', default='-', type=click.File('r'), help='Configuration file (yaml)')
@@ -263,7 +601,7 @@ def cli(verbose=0):
 def serve(config, listen):
   host, _, port = listen.partition(':')
   port = int(port)
-  app = _create_app(yaml.load(config, Loader=yaml.BaseLoader))
+  app = _create_app(_load_config(config))
   web.run_app(app, host=host, port=port)
 
 async def _mount_main(mappings, upperdir, mountdir, *rclone_flags):
@@ -275,12 +613,24 @@ async def _mount_main(mappings, upperdir, mountdir, *rclone_flags):
 @click.option('-c', '--config', default='-', type=click.File('r'), help='Configuration file (yaml) for lowerdir')
 @click.argument('upperdir', type=str)
 @click.argument('mountdir', type=click.Path(exists=True, dir_okay=True, file_okay=False))
+@click.option('--transfers', type=int, default=32, show_default=True, help='Number of file transfers to run in parallel (rclone)')
+@click.option('--checkers', type=int, default=64, show_default=True, help='Number of checkers to run in parallel (rclone)')
+@click.option('--dir-cache-time', type=str, default='72h', show_default=True, help='Time to cache directory entries for (rclone)')
+@click.option('--attr-timeout', type=str, default='1h', show_default=True, help='Time for which file/directory attributes are cached (rclone)')
+@click.option('--vfs-cache-mode', type=click.Choice(['off', 'minimal', 'writes', 'full']), default='full', show_default=True, help='Cache mode (rclone)')
+@click.option('--vfs-cache-max-size', type=str, default='10G', show_default=True, help='Max total size of objects in the cache (rclone)')
 @click.argument('rclone_flags', nargs=-1)
-def mount(upperdir, mountdir, config, rclone_flags):
+def mount(upperdir, mountdir, config, transfers, checkers, dir_cache_time, attr_timeout, vfs_cache_mode, vfs_cache_max_size, rclone_flags):
   asyncio.run(_mount_main(
-    yaml.load(config, Loader=yaml.BaseLoader),
+    _load_config(config),
     upperdir,
     mountdir,
+    f"--transfers={transfers}",
+    f"--checkers={checkers}",
+    f"--dir-cache-time={dir_cache_time}",
+    f"--attr-timeout={attr_timeout}",
+    f"--vfs-cache-mode={vfs_cache_mode}",
+    f"--vfs-cache-max-size={vfs_cache_max_size}",
     *rclone_flags,
   ))
 